@@ -3,10 +3,58 @@ Django Admin configuration for Staffly accounts app.
 Provides a customized admin interface for user management.
 """
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.db import transaction
+from django.utils import timezone
 from django.utils.html import format_html
+from django.utils.safestring import mark_safe
 
-from .models import User
+from .models import User, UserStats
+from .paginators import EstimatedPaginator
+
+
+# Max rows touched per UPDATE statement in bulk admin actions
+BULK_UPDATE_BATCH_SIZE = 10000
+
+
+def _batched_update(queryset, batch_size=BULK_UPDATE_BATCH_SIZE, **fields):
+    """
+    Apply ``queryset.update(**fields)`` in primary-key batches.
+    
+    Each batch runs in its own transaction so large selections never
+    hold a lock on the whole table or build one huge IN list.
+    Returns the total number of rows updated.
+    """
+    # QuerySet.update() skips auto_now; the profile page validators need it
+    fields.setdefault('updated_at', timezone.now())
+    pks = list(queryset.order_by().values_list('pk', flat=True))
+    count = 0
+    for start in range(0, len(pks), batch_size):
+        with transaction.atomic():
+            count += User.objects.filter(
+                pk__in=pks[start:start + batch_size]
+            ).update(**fields)
+    # QuerySet.update() skips the signals that maintain UserStats
+    if count and UserStats.COUNTED_FIELDS.intersection(fields):
+        UserStats.recompute()
+    return count
+
+
+class UserChangeList(ChangeList):
+    """
+    Changelist that only loads the columns shown in the list.
+    Skips large fields such as bio and the password hash.
+    """
+    
+    list_columns = (
+        'id', 'email', 'display_name', 'role',
+        'is_active', 'department', 'date_joined', 'last_login',
+    )
+    
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        return queryset.only(*self.list_columns)
 
 
 @admin.register(User)
@@ -35,16 +83,19 @@ class UserAdmin(BaseUserAdmin):
         'department',
     )
     
+    # Limited to the columns backed by trigram indexes on Postgres
+    # (department is still available through list_filter).
     search_fields = (
         'email', 
-        'first_name', 
-        'last_name', 
-        'department',
-        'job_title',
+        'display_name', 
     )
     
     ordering = ('-date_joined',)
     
+    # Avoid the extra unfiltered COUNT(*) on every changelist page
+    show_full_result_count = False
+    paginator = EstimatedPaginator
+    
     # Fieldsets for add/edit forms
     fieldsets = (
         (None, {
@@ -78,39 +129,49 @@ class UserAdmin(BaseUserAdmin):
     
     readonly_fields = ('last_login', 'date_joined')
     
+    # Badge styles live in a static stylesheet instead of inline styles
+    ROLE_LABELS = dict(User.Role.choices)
+    ACTIVE_BADGE = mark_safe('<span class="staffly-badge staffly-badge-active">Active</span>')
+    INACTIVE_BADGE = mark_safe('<span class="staffly-badge staffly-badge-inactive">Inactive</span>')
+    
+    class Media:
+        css = {
+            'all': ('accounts/css/admin_badges.css',),
+        }
+    
+    def get_changelist(self, request, **kwargs):
+        return UserChangeList
+    
+    def formfield_for_manytomany(self, db_field, request=None, **kwargs):
+        if db_field.name == 'user_permissions':
+            # Permission labels include the content type; fetch it in the same
+            # query and skip the columns the widget never shows.
+            qs = kwargs.get('queryset', db_field.remote_field.model.objects)
+            kwargs['queryset'] = qs.select_related('content_type').only(
+                'id', 'name', 'content_type__app_label', 'content_type__model',
+            )
+        return super().formfield_for_manytomany(db_field, request=request, **kwargs)
+    
     # Custom methods for list display
     def full_name(self, obj):
         """Display user's full name."""
-        return obj.get_full_name() or '-'
+        return obj.display_name or '-'
     full_name.short_description = 'Name'
     
     def role_badge(self, obj):
         """Display role as a colored badge."""
-        colors = {
-            'ADMIN': '#dc2626',    # Red
-            'STAFF': '#2563eb',    # Blue
-            'USER': '#16a34a',     # Green
-        }
-        color = colors.get(obj.role, '#6b7280')
         return format_html(
-            '<span style="background-color: {}; color: white; padding: 3px 8px; '
-            'border-radius: 4px; font-size: 11px; font-weight: 500;">{}</span>',
-            color,
-            obj.get_role_display()
+            '<span class="staffly-badge staffly-badge-{}">{}</span>',
+            obj.role.lower(),
+            self.ROLE_LABELS.get(obj.role, obj.role),
         )
     role_badge.short_description = 'Role'
     
     def status_badge(self, obj):
         """Display status as a colored badge."""
         if obj.is_active:
-            return format_html(
-                '<span style="background-color: #16a34a; color: white; padding: 3px 8px; '
-                'border-radius: 4px; font-size: 11px;">Active</span>'
-            )
-        return format_html(
-            '<span style="background-color: #dc2626; color: white; padding: 3px 8px; '
-            'border-radius: 4px; font-size: 11px;">Inactive</span>'
-        )
+            return self.ACTIVE_BADGE
+        return self.INACTIVE_BADGE
     status_badge.short_description = 'Status'
     
     # Admin actions
@@ -118,24 +179,24 @@ class UserAdmin(BaseUserAdmin):
     
     @admin.action(description='Activate selected users')
     def activate_users(self, request, queryset):
-        count = queryset.update(is_active=True)
+        count = _batched_update(queryset, is_active=True)
         self.message_user(request, f'{count} user(s) activated.')
     
     @admin.action(description='Deactivate selected users')
     def deactivate_users(self, request, queryset):
         # Don't deactivate the current user
         queryset = queryset.exclude(pk=request.user.pk)
-        count = queryset.update(is_active=False)
+        count = _batched_update(queryset, is_active=False)
         self.message_user(request, f'{count} user(s) deactivated.')
     
     @admin.action(description='Change role to Staff')
     def make_staff(self, request, queryset):
-        count = queryset.update(role='STAFF')
+        count = _batched_update(queryset, role='STAFF')
         self.message_user(request, f'{count} user(s) changed to Staff role.')
     
     @admin.action(description='Change role to Regular User')
     def make_regular_user(self, request, queryset):
         # Don't change the current user's role
         queryset = queryset.exclude(pk=request.user.pk)
-        count = queryset.update(role='USER')
+        count = _batched_update(queryset, role='USER')
         self.message_user(request, f'{count} user(s) changed to Regular User role.')
@@ -0,0 +1,38 @@
+"""
+Authentication backends for Staffly.
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+
+UserModel = get_user_model()
+
+
+class EmailBackend(ModelBackend):
+    """
+    Email/password backend that loads only the columns login needs.
+    Skips large profile fields such as bio on every login attempt.
+    """
+    
+    login_fields = (
+        'id', 'email', 'password', 'first_name', 'last_name',
+        'role', 'is_active', 'last_login',
+    )
+    
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = UserModel._default_manager.only(*self.login_fields).get(
+                **{UserModel.USERNAME_FIELD: username}
+            )
+        except UserModel.DoesNotExist:
+            # Run the default password hasher once to reduce the timing
+            # difference between an existing and a nonexistent user.
+            UserModel().set_password(password)
+        else:
+            if user.check_password(password) and self.user_can_authenticate(user):
+                return user
+        return None
@@ -5,8 +5,30 @@ Provides role-based access control for views.
 from functools import wraps
 from django.shortcuts import redirect
 from django.contrib import messages
-from django.contrib.auth.decorators import login_required
+from django.contrib.auth.views import redirect_to_login
 from django.core.exceptions import PermissionDenied
+from django.utils.cache import patch_cache_control, patch_vary_headers
+
+from .models import User
+
+
+# Seconds a browser may cache the redirect away from anonymous-only pages
+ANONYMOUS_REDIRECT_MAX_AGE = 30
+
+
+def get_user_role(request):
+    """
+    Return the current user's role, memoized on the request.
+    
+    Middleware, decorators and mixins can all check the role during one
+    request; only the first call touches the user object.
+    """
+    try:
+        return request._cached_user_role
+    except AttributeError:
+        user = request.user
+        request._cached_user_role = user.role if user.is_authenticated else None
+        return request._cached_user_role
 
 
 def role_required(allowed_roles):
@@ -18,11 +40,15 @@ def role_required(allowed_roles):
         def my_view(request):
             ...
     """
+    allowed_roles = frozenset(allowed_roles)
+    
     def decorator(view_func):
         @wraps(view_func)
-        @login_required
         def wrapper(request, *args, **kwargs):
-            if request.user.role in allowed_roles:
+            role = get_user_role(request)
+            if role is None:
+                return redirect_to_login(request.get_full_path())
+            if role in allowed_roles:
                 return view_func(request, *args, **kwargs)
             messages.error(request, 'You do not have permission to access this page.')
             return redirect('dashboard:router')
@@ -40,9 +66,11 @@ def admin_required(view_func):
             ...
     """
     @wraps(view_func)
-    @login_required
     def wrapper(request, *args, **kwargs):
-        if request.user.role == 'ADMIN':
+        role = get_user_role(request)
+        if role is None:
+            return redirect_to_login(request.get_full_path())
+        if role == 'ADMIN':
             return view_func(request, *args, **kwargs)
         messages.error(request, 'Administrator access required.')
         return redirect('dashboard:router')
@@ -59,9 +87,11 @@ def staff_required(view_func):
             ...
     """
     @wraps(view_func)
-    @login_required
     def wrapper(request, *args, **kwargs):
-        if request.user.role in ['ADMIN', 'STAFF']:
+        role = get_user_role(request)
+        if role is None:
+            return redirect_to_login(request.get_full_path())
+        if role in User.STAFF_ROLES:
             return view_func(request, *args, **kwargs)
         messages.error(request, 'Staff access required.')
         return redirect('dashboard:router')
@@ -79,8 +109,9 @@ def user_required(view_func):
             ...
     """
     @wraps(view_func)
-    @login_required
     def wrapper(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
         return view_func(request, *args, **kwargs)
     return wrapper
 
@@ -98,7 +129,13 @@ def anonymous_required(view_func):
     @wraps(view_func)
     def wrapper(request, *args, **kwargs):
         if request.user.is_authenticated:
-            return redirect('dashboard:router')
+            response = redirect('dashboard:router')
+            # Let the browser reuse the redirect while the session cookie
+            # is unchanged; logging out changes the cookies and misses it.
+            if request.method in ('GET', 'HEAD'):
+                patch_cache_control(response, private=True, max_age=ANONYMOUS_REDIRECT_MAX_AGE)
+                patch_vary_headers(response, ('Cookie',))
+            return response
         return view_func(request, *args, **kwargs)
     return wrapper
 
@@ -111,13 +148,17 @@ class RoleRequiredMixin:
         class MyView(RoleRequiredMixin, View):
             allowed_roles = ['ADMIN', 'STAFF']
     """
-    allowed_roles = []
+    allowed_roles = frozenset()
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.allowed_roles = frozenset(cls.allowed_roles)
     
     def dispatch(self, request, *args, **kwargs):
         if not request.user.is_authenticated:
             return redirect('accounts:login')
         
-        if request.user.role not in self.allowed_roles:
+        if get_user_role(request) not in self.allowed_roles:
             messages.error(request, 'You do not have permission to access this page.')
             return redirect('dashboard:router')
         
@@ -6,6 +6,7 @@ from django import forms
 from django.contrib.auth.forms import AuthenticationForm, SetPasswordForm
 from django.contrib.auth import authenticate
 from django.core.exceptions import ValidationError
+from django.db import transaction
 
 from .models import User
 
@@ -118,7 +119,9 @@ class UserCreationForm(forms.ModelForm):
         user = super().save(commit=False)
         user.set_password(self.cleaned_data['password1'])
         if commit:
-            user.save()
+            with transaction.atomic():
+                user.save()
+                self.save_m2m()
         return user
 
 
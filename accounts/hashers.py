@@ -0,0 +1,15 @@
+"""
+Password hashers for Staffly.
+"""
+from django.contrib.auth.hashers import Argon2PasswordHasher
+
+
+class StafflyArgon2PasswordHasher(Argon2PasswordHasher):
+    """
+    Argon2id hasher tuned for interactive logins.
+    Uses less memory and fewer lanes than Django's defaults so a
+    verification stays fast on small web dynos.
+    """
+    time_cost = 2
+    memory_cost = 65536  # KiB
+    parallelism = 2
@@ -54,3 +54,22 @@ class UserManager(BaseUserManager):
     def get_regular_users(self):
         """Return all regular users."""
         return self.filter(role='USER', is_active=True)
+    
+    # Streaming variants for bulk consumers. Prefer these over the get_*
+    # querysets when the caller only loops over the users once and does not
+    # need len(); rows are fetched chunk_size at a time (using a server-side
+    # cursor on PostgreSQL) instead of being cached in memory all at once.
+    
+    ITER_FIELDS = ('id', 'email', 'first_name', 'last_name', 'role')
+    
+    def iter_admins(self, chunk_size=2000):
+        """Iterate over active admin users in chunks."""
+        return self.get_admins().only(*self.ITER_FIELDS).iterator(chunk_size=chunk_size)
+    
+    def iter_staff(self, chunk_size=2000):
+        """Iterate over active staff users in chunks."""
+        return self.get_staff().only(*self.ITER_FIELDS).iterator(chunk_size=chunk_size)
+    
+    def iter_regular_users(self, chunk_size=2000):
+        """Iterate over active regular users in chunks."""
+        return self.get_regular_users().only(*self.ITER_FIELDS).iterator(chunk_size=chunk_size)
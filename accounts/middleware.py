@@ -2,9 +2,87 @@
 Middleware for Staffly.
 Handles role-based access control at the middleware level.
 """
-from django.shortcuts import redirect
+import re
+import threading
+from datetime import timedelta
+
+from django.http import HttpResponseRedirect
 from django.contrib import messages
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import Case, DateTimeField, Value, When
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from .decorators import get_user_role
+from .models import User
+
+
+# Pending last_login timestamps keyed by user pk, written in batches
+_PENDING_LAST_LOGINS = {}
+_PENDING_LOCK = threading.Lock()
+_flush_timer = None
+
+LAST_LOGIN_FLUSH_SIZE = 500
+LAST_LOGIN_FLUSH_INTERVAL = 30  # seconds
+LAST_LOGIN_THROTTLE = 3600  # seconds
+LAST_LOGIN_UPDATE_INTERVAL = timedelta(hours=1)
+ACCESS_DENIED_MESSAGE_THROTTLE = 5  # seconds
+
+
+def flush_pending_last_logins():
+    """
+    Write all queued last_login timestamps with a single UPDATE.
+    Returns the number of rows updated.
+    """
+    global _flush_timer
+    
+    with _PENDING_LOCK:
+        pending = dict(_PENDING_LAST_LOGINS)
+        _PENDING_LAST_LOGINS.clear()
+        if _flush_timer is not None:
+            _flush_timer.cancel()
+            _flush_timer = None
+    
+    if not pending:
+        return 0
+    
+    return get_user_model().objects.filter(pk__in=pending).update(
+        last_login=Case(
+            *[When(pk=pk, then=Value(ts)) for pk, ts in pending.items()],
+            output_field=DateTimeField(),
+        )
+    )
+
+
+def _flush_on_timer():
+    """Flush the batch from the timer thread, then drop its DB connection."""
+    try:
+        flush_pending_last_logins()
+    finally:
+        connections.close_all()
+
+
+def _queue_last_login(user_pk, timestamp):
+    """
+    Queue a last_login update. The batch is written once it is full, or
+    LAST_LOGIN_FLUSH_INTERVAL seconds after its first entry by a timer,
+    so a quiet process does not hold timestamps indefinitely.
+    """
+    global _flush_timer
+    
+    with _PENDING_LOCK:
+        _PENDING_LAST_LOGINS[user_pk] = timestamp
+        if _flush_timer is None:
+            _flush_timer = threading.Timer(LAST_LOGIN_FLUSH_INTERVAL, _flush_on_timer)
+            _flush_timer.daemon = True
+            _flush_timer.start()
+        due = len(_PENDING_LAST_LOGINS) >= LAST_LOGIN_FLUSH_SIZE
+    
+    if due:
+        flush_pending_last_logins()
 
 
 class RoleBasedAccessMiddleware:
@@ -37,38 +115,69 @@ class RoleBasedAccessMiddleware:
     
     def __init__(self, get_response):
         self.get_response = get_response
+        # Classify a path against all pattern lists with a single match()
+        self._path_re = re.compile(
+            '^(?:(?P<public>{})|(?P<admin>{})|(?P<staff>{}))'.format(
+                self._alternation(self.PUBLIC_PATTERNS),
+                self._alternation(self.ADMIN_ONLY_PATTERNS),
+                self._alternation(self.STAFF_PATTERNS),
+            )
+        )
+    
+    @staticmethod
+    def _alternation(patterns):
+        """Build a regex alternation matching any of the given path prefixes."""
+        return '|'.join(re.escape(pattern) for pattern in patterns)
     
     def __call__(self, request):
-        # Skip middleware for public patterns
-        for pattern in self.PUBLIC_PATTERNS:
-            if request.path.startswith(pattern):
-                return self.get_response(request)
+        match = self._path_re.match(request.path)
+        
+        # Skip middleware for public and unprotected patterns
+        if match is None or match.lastgroup == 'public':
+            return self.get_response(request)
         
         # Skip if user is not authenticated (let login_required handle it)
         if not request.user.is_authenticated:
             return self.get_response(request)
         
         # Check admin-only patterns
-        for pattern in self.ADMIN_ONLY_PATTERNS:
-            if request.path.startswith(pattern):
-                if request.user.role != 'ADMIN':
-                    messages.error(request, 'Administrator access required.')
-                    return redirect('dashboard:router')
+        if match.lastgroup == 'admin':
+            if get_user_role(request) != 'ADMIN':
+                return self._deny(request, 'Administrator access required.')
         
         # Check staff patterns
-        for pattern in self.STAFF_PATTERNS:
-            if request.path.startswith(pattern):
-                if request.user.role not in ['ADMIN', 'STAFF']:
-                    messages.error(request, 'Staff access required.')
-                    return redirect('dashboard:router')
+        elif match.lastgroup == 'staff':
+            if get_user_role(request) not in User.STAFF_ROLES:
+                return self._deny(request, 'Staff access required.')
         
         return self.get_response(request)
+    
+    @cached_property
+    def _denied_redirect_url(self):
+        return reverse('dashboard:router')
+    
+    def _deny(self, request, message):
+        """
+        Redirect to the user's dashboard, flashing the error at most once
+        per user and path within ACCESS_DENIED_MESSAGE_THROTTLE seconds.
+        """
+        cache_key = f'access_denied:{request.user.pk}:{request.path}'
+        if cache.add(cache_key, 1, ACCESS_DENIED_MESSAGE_THROTTLE):
+            messages.error(request, message)
+        return HttpResponseRedirect(self._denied_redirect_url)
 
 
 class UpdateLastLoginMiddleware:
     """
     Middleware that updates the user's last login timestamp
     on each request (rate limited to once per hour).
+    
+    Updates are throttled through the cache so only one worker queues
+    a given user per hour, and queued timestamps are written in batches
+    instead of one UPDATE per request.
+    
+    Not enabled in settings.MIDDLEWARE; add it after
+    AuthenticationMiddleware to track activity this way.
     """
     
     def __init__(self, get_response):
@@ -76,17 +185,13 @@ class UpdateLastLoginMiddleware:
     
     def __call__(self, request):
         if request.user.is_authenticated:
-            from django.utils import timezone
-            from datetime import timedelta
-            
             # Update last login if more than 1 hour has passed
-            if request.user.last_login:
-                time_since_login = timezone.now() - request.user.last_login
-                if time_since_login > timedelta(hours=1):
-                    request.user.last_login = timezone.now()
-                    request.user.save(update_fields=['last_login'])
-            else:
-                request.user.last_login = timezone.now()
-                request.user.save(update_fields=['last_login'])
+            now = timezone.now()
+            last_login = request.user.last_login
+            if last_login is None or now - last_login > LAST_LOGIN_UPDATE_INTERVAL:
+                cache_key = f'last_login:{request.user.pk}'
+                if cache.add(cache_key, 1, LAST_LOGIN_THROTTLE):
+                    request.user.last_login = now
+                    _queue_last_login(request.user.pk, now)
         
         return self.get_response(request)
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.30 on 2026-10-15 21:21
+
+from django.db import migrations, models
+from django.db.models import Value
+from django.db.models.functions import Coalesce, Concat, NullIf, Trim
+
+
+def populate_display_name(apps, schema_editor):
+    User = apps.get_model('accounts', 'User')
+    full_name = Trim(Concat('first_name', Value(' '), 'last_name'))
+    User.objects.update(
+        display_name=Coalesce(NullIf(full_name, Value('')), 'email')
+    )
+
+
+def create_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS user_display_name_trgm ON accounts_user '
+        'USING gin (UPPER(display_name::text) gin_trgm_ops)'
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS user_display_name_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_user_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='display_name',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text='Full name (or email) kept in sync on save for list displays.', max_length=301, verbose_name='display name'),
+        ),
+        migrations.RunPython(populate_display_name, migrations.RunPython.noop),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
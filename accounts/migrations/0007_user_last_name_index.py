@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-15 21:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_user_department_trigram_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['last_name', 'id'], name='user_last_name_id_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.30 on 2026-10-15 21:28
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def populate_user_stats(apps, schema_editor):
+    User = apps.get_model('accounts', 'User')
+    UserStats = apps.get_model('accounts', 'UserStats')
+    counts = User.objects.aggregate(
+        total=Count('pk'),
+        active=Count('pk', filter=Q(is_active=True)),
+        inactive=Count('pk', filter=Q(is_active=False)),
+        admin_count=Count('pk', filter=Q(role='ADMIN')),
+        staff_count=Count('pk', filter=Q(role='STAFF')),
+        user_count=Count('pk', filter=Q(role='USER')),
+    )
+    UserStats.objects.update_or_create(pk=1, defaults=counts)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_user_last_name_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total', models.PositiveIntegerField(default=0, verbose_name='total users')),
+                ('active', models.PositiveIntegerField(default=0, verbose_name='active users')),
+                ('inactive', models.PositiveIntegerField(default=0, verbose_name='inactive users')),
+                ('admin_count', models.PositiveIntegerField(default=0, verbose_name='administrators')),
+                ('staff_count', models.PositiveIntegerField(default=0, verbose_name='staff members')),
+                ('user_count', models.PositiveIntegerField(default=0, verbose_name='regular users')),
+            ],
+            options={
+                'verbose_name': 'user statistics',
+                'verbose_name_plural': 'user statistics',
+            },
+        ),
+        migrations.RunPython(populate_user_stats, migrations.RunPython.noop),
+    ]
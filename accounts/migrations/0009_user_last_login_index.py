@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-15 21:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0008_userstats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['last_login'], name='user_last_login_idx'),
+        ),
+    ]
@@ -4,7 +4,9 @@ Uses email as the primary identifier with role-based access control.
 """
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
 from django.db import models
+from django.db.models import Count, F
 from django.utils import timezone
+from django.utils.functional import cached_property
 
 from .managers import UserManager
 
@@ -20,6 +22,9 @@ class User(AbstractBaseUser, PermissionsMixin):
         STAFF = 'STAFF', 'Staff Member'
         USER = 'USER', 'Regular User'
     
+    # Roles allowed to use staff features
+    STAFF_ROLES = frozenset([Role.ADMIN, Role.STAFF])
+    
     # Primary fields
     email = models.EmailField(
         'email address',
@@ -30,6 +35,14 @@ class User(AbstractBaseUser, PermissionsMixin):
     )
     first_name = models.CharField('first name', max_length=150, blank=True)
     last_name = models.CharField('last name', max_length=150, blank=True)
+    display_name = models.CharField(
+        'display name',
+        max_length=301,
+        blank=True,
+        db_index=True,
+        editable=False,
+        help_text='Full name (or email) kept in sync on save for list displays.'
+    )
     
     # Role and status
     role = models.CharField(
@@ -77,10 +90,24 @@ class User(AbstractBaseUser, PermissionsMixin):
         verbose_name = 'user'
         verbose_name_plural = 'users'
         ordering = ['-date_joined']
+        indexes = [
+            models.Index(fields=['role', 'is_active', 'first_name'], name='user_role_active_fn_idx'),
+            models.Index(fields=['department', 'is_active'], name='user_department_active_idx'),
+            models.Index(fields=['date_joined', 'id'], name='user_date_joined_id_idx'),
+            models.Index(fields=['last_name', 'id'], name='user_last_name_id_idx'),
+            models.Index(fields=['last_login'], name='user_last_login_idx'),
+        ]
     
     def __str__(self):
         return self.email
     
+    def save(self, *args, **kwargs):
+        self.display_name = self.get_full_name()[:301]
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'first_name', 'last_name', 'email'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'display_name'}
+        super().save(*args, **kwargs)
+    
     def get_full_name(self):
         """Return the first_name plus the last_name, with a space in between."""
         full_name = f'{self.first_name} {self.last_name}'.strip()
@@ -88,15 +115,26 @@ class User(AbstractBaseUser, PermissionsMixin):
     
     def get_short_name(self):
         """Return the short name for the user."""
-        return self.first_name if self.first_name else self.email.split('@')[0]
+        return self.short_name
     
     def get_initials(self):
         """Return user initials for avatar display."""
-        if self.first_name and self.last_name:
-            return f'{self.first_name[0]}{self.last_name[0]}'.upper()
-        elif self.first_name:
-            return self.first_name[:2].upper()
-        return self.email[:2].upper()
+        return self.initials
+    
+    @cached_property
+    def short_name(self):
+        """Short name, computed once per instance."""
+        return self.first_name or self.email.split('@')[0]
+    
+    @cached_property
+    def initials(self):
+        """Initials for avatar display, computed once per instance."""
+        first_name, last_name = self.first_name, self.last_name
+        if first_name and last_name:
+            initials = first_name[0] + last_name[0]
+        else:
+            initials = first_name[:2] or self.email[:2]
+        return initials.upper()
     
     # Role check methods
     def is_admin(self):
@@ -121,4 +159,79 @@ class User(AbstractBaseUser, PermissionsMixin):
     
     def can_access_staff_features(self):
         """Check if user can access staff features."""
-        return self.role in [self.Role.ADMIN, self.Role.STAFF]
+        return self.role in self.STAFF_ROLES
+
+
+class UserStats(models.Model):
+    """
+    Single-row table of denormalized user counters for dashboards.
+    
+    Kept current by the signal handlers in accounts.signals. Bulk
+    QuerySet.update() calls bypass model signals, so code that changes
+    role or is_active in bulk must call UserStats.recompute() afterwards.
+    """
+    
+    total = models.PositiveIntegerField('total users', default=0)
+    active = models.PositiveIntegerField('active users', default=0)
+    inactive = models.PositiveIntegerField('inactive users', default=0)
+    admin_count = models.PositiveIntegerField('administrators', default=0)
+    staff_count = models.PositiveIntegerField('staff members', default=0)
+    user_count = models.PositiveIntegerField('regular users', default=0)
+    
+    # User fields the counters depend on
+    COUNTED_FIELDS = frozenset(['role', 'is_active'])
+    
+    # Counter column for each role
+    ROLE_COUNTERS = {
+        User.Role.ADMIN: 'admin_count',
+        User.Role.STAFF: 'staff_count',
+        User.Role.USER: 'user_count',
+    }
+    
+    class Meta:
+        verbose_name = 'user statistics'
+        verbose_name_plural = 'user statistics'
+    
+    def __str__(self):
+        return f'{self.total} users'
+    
+    @classmethod
+    def current(cls):
+        """Return the statistics row, building it if it does not exist yet."""
+        return cls.objects.filter(pk=1).first() or cls.recompute()
+    
+    @classmethod
+    def recompute(cls):
+        """Rebuild the counters from the users table."""
+        counts = cls.breakdown()
+        stats, _created = cls.objects.update_or_create(pk=1, defaults=counts)
+        return stats
+    
+    @classmethod
+    def breakdown(cls):
+        """Count users per counter column with a single GROUP BY query."""
+        counts = dict.fromkeys(
+            ['total', 'active', 'inactive', *cls.ROLE_COUNTERS.values()], 0
+        )
+        # Clear the default ordering so it does not leak into the GROUP BY
+        rows = User.objects.order_by().values_list('role', 'is_active').annotate(
+            count=Count('pk')
+        )
+        for role, is_active, count in rows:
+            counts['total'] += count
+            counts['active' if is_active else 'inactive'] += count
+            if role in cls.ROLE_COUNTERS:
+                counts[cls.ROLE_COUNTERS[role]] += count
+        return counts
+    
+    @classmethod
+    def apply_delta(cls, **deltas):
+        """Atomically add the given amounts to the counters."""
+        deltas = {column: delta for column, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        updated = cls.objects.filter(pk=1).update(
+            **{column: F(column) + delta for column, delta in deltas.items()}
+        )
+        if not updated:
+            cls.recompute()
@@ -0,0 +1,173 @@
+"""
+Custom paginators for Staffly.
+Avoids expensive row counts and deep OFFSET scans on large user tables.
+"""
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.db import connections
+from django.db.models import Count, Q, Window
+from django.utils.functional import cached_property
+
+
+class EstimatedPaginator(Paginator):
+    """
+    Paginator that uses PostgreSQL's planner estimate for unfiltered counts.
+    
+    An unfiltered COUNT(*) is a sequential scan on Postgres. When the
+    queryset has no WHERE clause, the row estimate from pg_class is used
+    instead; small tables and filtered querysets still get an exact count.
+    """
+    
+    # Below this many rows an exact count is cheap enough
+    estimate_threshold = 10000
+    
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        query = getattr(queryset, 'query', None)
+        if query is not None and not query.where:
+            connection = connections[queryset.db]
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        'SELECT reltuples::bigint FROM pg_class WHERE relname = %s',
+                        [queryset.model._meta.db_table],
+                    )
+                    row = cursor.fetchone()
+                if row and row[0] >= self.estimate_threshold:
+                    return row[0]
+        return super().count
+
+
+class KeysetPaginator(Paginator):
+    """
+    Paginator that seeks from the boundary row of the neighbouring page.
+    
+    Rows are ordered by the given field with the primary key as a
+    tie-breaker. Pages reached through next/previous links carry a cursor
+    (the boundary row's ordering value and pk), so they are fetched with
+    an indexed range condition instead of an OFFSET that reads and throws
+    away every earlier row. Pages requested by number alone, or ordered
+    by something other than a plain model field, use OFFSET slicing, with
+    the total count read from a window function in the same query. The
+    OFFSET runs over primary keys only; the full rows are then loaded for
+    the selected keys alone.
+    """
+    
+    def __init__(self, object_list, per_page, ordering, **kwargs):
+        self.descending = ordering.startswith('-')
+        field_name = ordering.lstrip('-')
+        try:
+            self.field = object_list.model._meta.get_field(field_name)
+        except FieldDoesNotExist:
+            self.field = None
+        pk_ordering = '-pk' if self.descending else 'pk'
+        super().__init__(object_list.order_by(ordering, pk_ordering), per_page, **kwargs)
+    
+    def get_page(self, number, after=None, before=None):
+        """
+        Return the page with the given number, seeking from ``after`` (the
+        previous page's last row) or ``before`` (the next page's first row)
+        when a valid cursor is supplied.
+        """
+        cursor = after or before
+        if not cursor:
+            # Numbered page: fetch the rows and the total in one query
+            page = self._counted_page(number)
+            if page is not None:
+                return self._with_cursors(page)
+        
+        try:
+            number = self.validate_number(number)
+        except PageNotAnInteger:
+            number = 1
+        except EmptyPage:
+            number = self.num_pages
+        
+        page = None
+        if cursor and self.field is not None:
+            try:
+                value, pk = self._parse_cursor(cursor)
+            except (ValueError, ValidationError):
+                pass
+            else:
+                page = self._seek_page(number, value, pk, forward=bool(after))
+        if page is None:
+            page = self.page(number)
+        return self._with_cursors(page)
+    
+    def page(self, number):
+        """Return a Page object for the given 1-based page number."""
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        top = bottom + self.per_page
+        if top + self.orphans >= self.count:
+            top = self.count
+        pks = self.object_list.values_list('pk', flat=True)[bottom:top]
+        return self._get_page(self._fetch_rows(pks), number, self)
+    
+    def _counted_page(self, number):
+        """
+        Fetch an OFFSET page together with the total row count, taken from
+        a COUNT(*) OVER () window, instead of issuing a separate COUNT.
+        Returns None when the page number is invalid or out of range so
+        the caller can fall back to the regular validation.
+        """
+        if self.orphans or 'count' in self.__dict__:
+            return None
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            number = 1
+        if number < 1:
+            return None
+        bottom = (number - 1) * self.per_page
+        keys = list(
+            self.object_list.annotate(
+                _window_total=Window(expression=Count('pk')),
+            ).values_list('pk', '_window_total')[bottom:bottom + self.per_page]
+        )
+        if not keys:
+            return None
+        self.__dict__['count'] = keys[0][1]
+        return self._get_page(self._fetch_rows([pk for pk, _total in keys]), number, self)
+    
+    def _fetch_rows(self, pks):
+        # Load the full rows for an already selected page of primary keys
+        return list(self.object_list.filter(pk__in=list(pks)))
+    
+    def _with_cursors(self, page):
+        if page.object_list:
+            page.previous_cursor = self._make_cursor(page.object_list[0])
+            page.next_cursor = self._make_cursor(page.object_list[-1])
+        return page
+    
+    def _seek_page(self, number, value, pk, forward):
+        # Walking forward in descending order means smaller values, etc.
+        lookup = 'gt' if forward != self.descending else 'lt'
+        name = self.field.name
+        queryset = self.object_list.filter(
+            Q(**{f'{name}__{lookup}': value}) |
+            Q(**{name: value, f'pk__{lookup}': pk})
+        )
+        if not forward:
+            queryset = queryset.reverse()
+        rows = list(queryset[:self.per_page])
+        if not rows:
+            # The boundary row moved or vanished; fall back to the page number
+            return None
+        if not forward:
+            rows.reverse()
+        return self._get_page(rows, number, self)
+    
+    def _make_cursor(self, obj):
+        if self.field is None:
+            return ''
+        value = getattr(obj, self.field.attname)
+        if hasattr(value, 'isoformat'):
+            value = value.isoformat()
+        return f'{value}|{obj.pk}'
+    
+    def _parse_cursor(self, cursor):
+        value, _sep, pk = cursor.rpartition('|')
+        return self.field.to_python(value), int(pk)
@@ -0,0 +1,54 @@
+"""
+Signal handlers for Staffly accounts.
+Keep the denormalized UserStats counters in step with user changes.
+"""
+from collections import Counter
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import User, UserStats
+
+
+def _count(deltas, role, is_active, sign):
+    """Add one user's contribution to the counter deltas."""
+    deltas['total'] += sign
+    deltas['active' if is_active else 'inactive'] += sign
+    column = UserStats.ROLE_COUNTERS.get(role)
+    if column:
+        deltas[column] += sign
+
+
+@receiver(pre_save, sender=User)
+def remember_counted_state(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Capture the stored role and status before an existing user is saved."""
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    if update_fields is not None and not UserStats.COUNTED_FIELDS.intersection(update_fields):
+        return
+    instance._counted_state = (
+        User.objects.filter(pk=instance.pk).values_list('role', 'is_active').first()
+    )
+
+
+@receiver(post_save, sender=User)
+def update_stats_on_save(sender, instance, created, raw=False, **kwargs):
+    """Adjust the counters for a created user or a role/status change."""
+    if raw:
+        return
+    deltas = Counter()
+    if not created:
+        old_state = instance.__dict__.pop('_counted_state', None)
+        if old_state is None or old_state == (instance.role, instance.is_active):
+            return
+        _count(deltas, *old_state, -1)
+    _count(deltas, instance.role, instance.is_active, 1)
+    UserStats.apply_delta(**deltas)
+
+
+@receiver(post_delete, sender=User)
+def update_stats_on_delete(sender, instance, **kwargs):
+    """Remove a deleted user from the counters."""
+    deltas = Counter()
+    _count(deltas, instance.role, instance.is_active, -1)
+    UserStats.apply_delta(**deltas)
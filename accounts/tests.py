@@ -1,3 +1,432 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.messages import get_messages
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from . import middleware
+from .backends import EmailBackend
+from .decorators import (
+    AdminRequiredMixin, RoleRequiredMixin, StaffRequiredMixin,
+    admin_required, role_required, staff_required, user_required,
+)
+from .models import User, UserStats
+from .paginators import KeysetPaginator
+
+
+class ProfileConditionalGetTests(TestCase):
+    """ETag/Last-Modified handling of the user detail page."""
+
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_superuser('admin@example.com', 'password')
+        self.user = User.objects.create_user('user@example.com', 'password')
+        self.client.force_login(self.admin)
+        # Move the stored timestamps back so a change made now is always later
+        an_hour_ago = timezone.now() - timedelta(hours=1)
+        User.objects.update(updated_at=an_hour_ago, last_login=an_hour_ago)
+        self.url = reverse('accounts:user_detail', args=[self.user.pk])
+        # First render sets the CSRF cookie, which is part of the ETag
+        self.client.get(self.url)
+
+    def test_unchanged_page_is_not_modified(self):
+        response = self.client.get(self.url)
+        revalidated = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_bulk_admin_action_invalidates_validators(self):
+        response = self.client.get(self.url)
+        self.client.post(reverse('admin:accounts_user_changelist'), {
+            'action': 'make_staff',
+            '_selected_action': [self.user.pk],
+        })
+
+        revalidated = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revalidated.status_code, 200)
+        self.assertContains(revalidated, User.Role.STAFF.label)
+
+        revalidated = self.client.get(
+            self.url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        self.assertEqual(revalidated.status_code, 200)
+
+
+class LastLoginBatchTests(TransactionTestCase):
+    """Batched last_login writes from UpdateLastLoginMiddleware."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('user@example.com', 'password')
+        self.addCleanup(middleware.flush_pending_last_logins)
+
+    def test_timer_flushes_a_quiet_batch(self):
+        timestamp = timezone.now() - timedelta(minutes=5)
+        with mock.patch.object(middleware, 'LAST_LOGIN_FLUSH_INTERVAL', 0.01):
+            middleware._queue_last_login(self.user.pk, timestamp)
+            timer = middleware._flush_timer
+        timer.join(5)
+        self.assertFalse(timer.is_alive())
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.last_login, timestamp)
+        self.assertIsNone(middleware._flush_timer)
+
+    def test_full_batch_is_flushed_immediately(self):
+        timestamp = timezone.now() - timedelta(minutes=5)
+        with mock.patch.object(middleware, 'LAST_LOGIN_FLUSH_SIZE', 1):
+            middleware._queue_last_login(self.user.pk, timestamp)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.last_login, timestamp)
+        self.assertIsNone(middleware._flush_timer)
+
+
+class UserStatsAssertionsMixin:
+
+    def assertStatsConsistent(self):
+        """Check the UserStats row against a fresh count of the users table."""
+        stats = UserStats.current()
+        counters = {column: getattr(stats, column) for column in UserStats.breakdown()}
+        self.assertEqual(counters, UserStats.breakdown())
+
+
+class UserToggleStatusTests(UserStatsAssertionsMixin, TestCase):
+    """The admin activate/deactivate view."""
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser('admin@example.com', 'password')
+        self.user = User.objects.create_user('user@example.com', 'password')
+        self.client.force_login(self.admin)
+        self.url = reverse('accounts:user_toggle_status', args=[self.user.pk])
+
+    def test_toggle_updates_status_and_counters(self):
+        self.client.post(self.url)
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_active)
+        self.assertStatsConsistent()
+
+        self.client.post(self.url)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.is_active)
+        self.assertStatsConsistent()
+
+    def test_concurrent_toggle_is_counted_once(self):
+        # Another request deactivated the user after this one read it
+        stale = User.objects.only('id', 'email', 'is_active').get(pk=self.user.pk)
+        self.client.post(self.url)
+        with mock.patch('accounts.views.get_object_or_404', return_value=stale):
+            self.client.post(self.url)
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_active)
+        self.assertStatsConsistent()
+
+
+class KeysetPaginatorTests(TestCase):
+    """Cursor and numbered page navigation in KeysetPaginator."""
+
+    ORDERINGS = [
+        '-date_joined', 'date_joined',
+        '-email', 'email',
+        '-last_name', 'last_name',
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        for i in range(25):
+            # Three users share each date_joined and last names repeat
+            User.objects.create_user(
+                f'user{i:02d}@example.com', 'password',
+                last_name='abc'[i % 3],
+                date_joined=now - timedelta(days=i // 3),
+            )
+
+    def paginator(self, ordering):
+        return KeysetPaginator(User.objects.all(), 10, ordering)
+
+    def expected(self, ordering):
+        pk_ordering = '-pk' if ordering.startswith('-') else 'pk'
+        return list(
+            User.objects.order_by(ordering, pk_ordering).values_list('pk', flat=True)
+        )
+
+    @staticmethod
+    def pks(page):
+        return [user.pk for user in page]
+
+    def test_cursor_walk_in_both_directions(self):
+        for ordering in self.ORDERINGS:
+            with self.subTest(ordering=ordering):
+                paginator = self.paginator(ordering)
+                page = paginator.get_page(1)
+                forward = self.pks(page)
+                while page.has_next():
+                    page = paginator.get_page(
+                        page.next_page_number(), after=page.next_cursor
+                    )
+                    forward += self.pks(page)
+                self.assertEqual(forward, self.expected(ordering))
+
+                backward = self.pks(page)
+                while page.has_previous():
+                    page = paginator.get_page(
+                        page.previous_page_number(), before=page.previous_cursor
+                    )
+                    backward = self.pks(page) + backward
+                self.assertEqual(backward, self.expected(ordering))
+
+    def test_numbered_pages(self):
+        for ordering in self.ORDERINGS:
+            expected = self.expected(ordering)
+            for number in (1, 2, 3):
+                with self.subTest(ordering=ordering, number=number):
+                    page = self.paginator(ordering).get_page(number)
+                    self.assertEqual(page.number, number)
+                    self.assertEqual(
+                        self.pks(page), expected[(number - 1) * 10:number * 10]
+                    )
+
+    def test_invalid_cursor_falls_back_to_page_number(self):
+        expected = self.expected('-date_joined')[10:20]
+        for cursor in ('garbage', 'not-a-date|1', '2020-01-01T00:00:00|x', '|'):
+            with self.subTest(cursor=cursor):
+                page = self.paginator('-date_joined').get_page(2, after=cursor)
+                self.assertEqual(page.number, 2)
+                self.assertEqual(self.pks(page), expected)
+
+    def test_unencoded_cursor_falls_back_to_page_number(self):
+        paginator = self.paginator('-date_joined')
+        cursor = paginator.get_page(1).next_cursor
+        self.assertIn('+', cursor)
+        # An unencoded '+' in a query string arrives as a space
+        page = self.paginator('-date_joined').get_page(2, after=cursor.replace('+', ' '))
+        self.assertEqual(self.pks(page), self.expected('-date_joined')[10:20])
+
+    def test_out_of_range_and_invalid_page_numbers(self):
+        expected = self.expected('email')
+        cases = [(99, 3), (0, 3), (-1, 3), ('x', 1), (None, 1), ('', 1)]
+        for number, resolved in cases:
+            with self.subTest(number=number):
+                page = self.paginator('email').get_page(number)
+                self.assertEqual(page.number, resolved)
+                self.assertEqual(
+                    self.pks(page), expected[(resolved - 1) * 10:resolved * 10]
+                )
+
+    def test_numbered_page_query_count(self):
+        paginator = self.paginator('-date_joined')
+        # Keys plus windowed total, then the rows for those keys
+        with self.assertNumQueries(2):
+            page = paginator.get_page(2)
+            self.assertEqual(paginator.count, 25)
+            self.assertEqual(paginator.num_pages, 3)
+            self.assertEqual(len(page), 10)
+
+    def test_cursor_page_query_count(self):
+        cursor = self.paginator('-date_joined').get_page(1).next_cursor
+        paginator = self.paginator('-date_joined')
+        # Total count for validating the page number, then the seek
+        with self.assertNumQueries(2):
+            page = paginator.get_page(2, after=cursor)
+            self.assertEqual(len(page), 10)
+
+
+class UserStatsTests(UserStatsAssertionsMixin, TestCase):
+    """UserStats counters kept in step by the accounts signals."""
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser('admin@example.com', 'password')
+        self.users = [
+            User.objects.create_user(f'user{i}@example.com', 'password') for i in range(4)
+        ]
+
+    def run_admin_action(self, action, users, **extra):
+        self.client.force_login(self.admin)
+        self.client.post(reverse('admin:accounts_user_changelist'), {
+            'action': action,
+            '_selected_action': [user.pk for user in users],
+            **extra,
+        })
+
+    def test_create(self):
+        self.assertStatsConsistent()
+        self.assertEqual(UserStats.current().total, 5)
+
+    def test_delete(self):
+        self.users[0].delete()
+        self.assertStatsConsistent()
+        self.assertEqual(UserStats.current().total, 4)
+
+    def test_queryset_delete(self):
+        User.objects.filter(pk__in=[self.users[0].pk, self.users[1].pk]).delete()
+        self.assertStatsConsistent()
+
+    def test_role_change(self):
+        user = self.users[0]
+        user.role = User.Role.STAFF
+        user.save()
+        self.assertStatsConsistent()
+        self.assertEqual(UserStats.current().staff_count, 1)
+
+    def test_status_change_with_update_fields(self):
+        user = self.users[0]
+        user.is_active = False
+        user.save(update_fields=['is_active'])
+        self.assertStatsConsistent()
+        self.assertEqual(UserStats.current().inactive, 1)
+
+    def test_unrelated_update_fields_leave_counters_alone(self):
+        user = self.users[0]
+        user.first_name = 'Ada'
+        user.save(update_fields=['first_name'])
+        self.assertStatsConsistent()
+
+    def test_bulk_admin_actions(self):
+        actions = [
+            ('deactivate_users', 'inactive', 3),
+            ('activate_users', 'inactive', 0),
+            ('make_staff', 'staff_count', 3),
+            ('make_regular_user', 'staff_count', 0),
+        ]
+        for action, column, expected in actions:
+            with self.subTest(action=action):
+                self.run_admin_action(action, self.users[:3])
+                self.assertStatsConsistent()
+                self.assertEqual(getattr(UserStats.current(), column), expected)
+
+    def test_admin_delete_selected(self):
+        self.run_admin_action('delete_selected', self.users[:2], post='yes')
+        self.assertEqual(User.objects.count(), 3)
+        self.assertStatsConsistent()
+
+    def test_missing_row_is_rebuilt(self):
+        UserStats.objects.all().delete()
+        self.users[0].delete()
+        self.assertStatsConsistent()
+
+
+def _ok_view(request):
+    return HttpResponse('ok')
+
+
+class AccessDecoratorTests(TestCase):
+    """The role-based view decorators and RoleRequiredMixin."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = {
+            role: User.objects.create_user(f'{role.lower()}@example.com', 'password', role=role)
+            for role in User.Role.values
+        }
+
+    def request(self, user=None):
+        request = RequestFactory().get('/protected/?tab=1')
+        request.user = user or AnonymousUser()
+        request.session = {}
+        request._messages = FallbackStorage(request)
+        return request
+
+    def decorated(self):
+        return {
+            'role_required': role_required([User.Role.ADMIN, User.Role.STAFF])(_ok_view),
+            'admin_required': admin_required(_ok_view),
+            'staff_required': staff_required(_ok_view),
+            'user_required': user_required(_ok_view),
+        }
+
+    def test_anonymous_users_are_sent_to_login(self):
+        login_url = reverse('accounts:login') + '?next=/protected/%3Ftab%3D1'
+        for name, view in self.decorated().items():
+            with self.subTest(decorator=name):
+                response = view(self.request())
+                self.assertEqual(response.status_code, 302)
+                self.assertEqual(response.url, login_url)
+
+    def test_allowed_roles_get_through(self):
+        allowed = {
+            'role_required': [User.Role.ADMIN, User.Role.STAFF],
+            'admin_required': [User.Role.ADMIN],
+            'staff_required': [User.Role.ADMIN, User.Role.STAFF],
+            'user_required': User.Role.values,
+        }
+        views = self.decorated()
+        for name, roles in allowed.items():
+            for role in roles:
+                with self.subTest(decorator=name, role=role):
+                    response = views[name](self.request(self.users[role]))
+                    self.assertEqual(response.status_code, 200)
+
+    def test_wrong_role_is_sent_to_dashboard_with_message(self):
+        denied = {
+            'role_required': [User.Role.USER],
+            'admin_required': [User.Role.STAFF, User.Role.USER],
+            'staff_required': [User.Role.USER],
+        }
+        views = self.decorated()
+        for name, roles in denied.items():
+            for role in roles:
+                with self.subTest(decorator=name, role=role):
+                    request = self.request(self.users[role])
+                    response = views[name](request)
+                    self.assertEqual(response.status_code, 302)
+                    self.assertEqual(response.url, reverse('dashboard:router'))
+                    errors = [m for m in get_messages(request) if m.level_tag == 'error']
+                    self.assertEqual(len(errors), 1)
+
+    def test_mixin_allowed_roles_are_frozensets(self):
+        class CustomMixin(RoleRequiredMixin):
+            allowed_roles = ['USER']
+
+        self.assertEqual(AdminRequiredMixin.allowed_roles, frozenset(['ADMIN']))
+        self.assertEqual(StaffRequiredMixin.allowed_roles, frozenset(['ADMIN', 'STAFF']))
+        self.assertEqual(CustomMixin.allowed_roles, frozenset(['USER']))
+        for mixin in (RoleRequiredMixin, AdminRequiredMixin, StaffRequiredMixin, CustomMixin):
+            self.assertIsInstance(mixin.allowed_roles, frozenset)
+
+
+class EmailBackendTests(TestCase):
+    """Email/password authentication through EmailBackend."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('user@example.com', 'correct-password')
+
+    def test_correct_password(self):
+        user = authenticate(None, email='user@example.com', password='correct-password')
+        self.assertEqual(user, self.user)
+        self.assertIsInstance(user, User)
+
+    def test_wrong_password(self):
+        self.assertIsNone(
+            authenticate(None, email='user@example.com', password='wrong-password')
+        )
+
+    def test_unknown_email_runs_the_dummy_hash(self):
+        with mock.patch.object(User, 'set_password', autospec=True) as set_password:
+            user = EmailBackend().authenticate(
+                None, username='nobody@example.com', password='correct-password'
+            )
+        self.assertIsNone(user)
+        set_password.assert_called_once_with(mock.ANY, 'correct-password')
+
+    def test_inactive_user_is_rejected(self):
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertIsNone(
+            authenticate(None, email='user@example.com', password='correct-password')
+        )
+
+    def test_pbkdf2_hash_is_upgraded_to_argon2(self):
+        User.objects.filter(pk=self.user.pk).update(
+            password=make_password('correct-password', hasher='pbkdf2_sha256')
+        )
+        user = authenticate(None, email='user@example.com', password='correct-password')
+        self.assertEqual(user, self.user)
+        # The upgrade is saved through the instance loaded with only()
+        self.assertTrue(user.get_deferred_fields())
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('argon2$'))
+        self.assertTrue(self.user.check_password('correct-password'))
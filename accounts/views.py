@@ -2,15 +2,19 @@
 Views for Staffly accounts app.
 Handles authentication and user management.
 """
+import hashlib
+
+from django.conf import settings
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login, logout, update_session_auth_hash
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.views.decorators.http import require_POST
-from django.core.paginator import Paginator
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_POST
 from django.db.models import Q
+from django.utils import timezone
 
-from .models import User
+from .models import User, UserStats
 from .forms import (
     LoginForm, 
     UserCreationForm, 
@@ -19,6 +23,63 @@ from .forms import (
     PasswordChangeForm
 )
 from .decorators import admin_required, anonymous_required
+from .paginators import KeysetPaginator
+
+
+# Orderings accepted by user_list; each is backed by an index
+USER_LIST_ORDERINGS = frozenset([
+    '-date_joined', 'date_joined',
+    '-email', 'email',
+    '-last_name', 'last_name',
+])
+
+
+# ============================================================================
+# Conditional GET Helpers
+# ============================================================================
+
+def _profile_page_timestamps(request, pk=None):
+    """
+    Timestamps a profile page depends on: those of the viewer, who also
+    appears in the page layout, and of the user with the given pk.
+    Returns None when the page has to be rendered regardless.
+    """
+    # Pending flash messages are displayed (and consumed) by a full render
+    if messages.get_messages(request):
+        return None
+    viewer = request.user
+    timestamps = [viewer.updated_at, viewer.last_login]
+    if pk is not None and pk != viewer.pk:
+        if not hasattr(request, '_profile_timestamps'):
+            # last_login is saved without touching updated_at, so read both
+            request._profile_timestamps = User.objects.filter(pk=pk).values_list(
+                'updated_at', 'last_login'
+            ).first()
+        if request._profile_timestamps is None:
+            return None
+        timestamps.extend(request._profile_timestamps)
+    return timestamps
+
+
+def _profile_etag(request, pk=None):
+    """ETag for a profile page; the CSRF cookie is included for its forms."""
+    timestamps = _profile_page_timestamps(request, pk)
+    if timestamps is None:
+        return None
+    parts = [
+        str(pk), str(request.user.pk),
+        request.COOKIES.get(settings.CSRF_COOKIE_NAME, ''),
+        *(str(timestamp) for timestamp in timestamps),
+    ]
+    return hashlib.md5(':'.join(parts).encode(), usedforsecurity=False).hexdigest()
+
+
+def _profile_last_modified(request, pk=None):
+    """Last-Modified for a profile page."""
+    timestamps = _profile_page_timestamps(request, pk)
+    if timestamps is None:
+        return None
+    return max(timestamp for timestamp in timestamps if timestamp is not None)
 
 
 # ============================================================================
@@ -73,9 +134,13 @@ def user_list(request):
     Display paginated list of all users with filtering.
     Admin only.
     """
-    users = User.objects.all()
+    # Only the columns the list template renders
+    users = User.objects.only(
+        'id', 'email', 'first_name', 'last_name', 'department', 'role',
+        'is_active', 'date_joined', 'last_login', 'profile_picture',
+    )
     
-    # Search filter
+    # Search filter (backed by trigram indexes on PostgreSQL)
     search = request.GET.get('search', '')
     if search:
         users = users.filter(
@@ -97,14 +162,21 @@ def user_list(request):
     elif status == 'inactive':
         users = users.filter(is_active=False)
     
-    # Ordering
+    # Ordering (applied by the paginator, with pk as a tie-breaker)
     ordering = request.GET.get('ordering', '-date_joined')
-    users = users.order_by(ordering)
+    if ordering not in USER_LIST_ORDERINGS:
+        ordering = '-date_joined'
     
     # Pagination
-    paginator = Paginator(users, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    paginator = KeysetPaginator(users, 10, ordering)
+    page_obj = paginator.get_page(
+        request.GET.get('page'),
+        after=request.GET.get('after'),
+        before=request.GET.get('before'),
+    )
+    
+    # User counts from the denormalized counters row
+    stats = UserStats.current()
     
     context = {
         'page_obj': page_obj,
@@ -112,9 +184,9 @@ def user_list(request):
         'role': role,
         'status': status,
         'ordering': ordering,
-        'total_users': User.objects.count(),
-        'active_users': User.objects.filter(is_active=True).count(),
-        'inactive_users': User.objects.filter(is_active=False).count(),
+        'total_users': stats.total,
+        'active_users': stats.active,
+        'inactive_users': stats.inactive,
         'roles': User.Role.choices,
     }
     
@@ -144,6 +216,8 @@ def user_create(request):
 
 
 @admin_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_profile_etag, last_modified_func=_profile_last_modified)
 def user_detail(request, pk):
     """
     View user details.
@@ -185,13 +259,14 @@ def user_delete(request, pk):
     Delete a user.
     Admin only.
     """
-    user = get_object_or_404(User, pk=pk)
-    
-    # Prevent self-deletion
-    if user == request.user:
+    # Prevent self-deletion; checked on the pk before loading anything
+    if pk == request.user.pk:
         messages.error(request, 'You cannot delete your own account.')
         return redirect('accounts:user_list')
     
+    # Load just what the message and UserStats signals need
+    user = get_object_or_404(User.objects.only('id', 'email', 'role', 'is_active'), pk=pk)
+    
     email = user.email
     user.delete()
     messages.success(request, f'User {email} deleted successfully.')
@@ -205,15 +280,25 @@ def user_toggle_status(request, pk):
     Toggle user active/inactive status.
     Admin only.
     """
-    user = get_object_or_404(User, pk=pk)
-    
-    # Prevent self-deactivation
-    if user == request.user:
+    # Prevent self-deactivation; checked on the pk before loading anything
+    if pk == request.user.pk:
         messages.error(request, 'You cannot deactivate your own account.')
         return redirect('accounts:user_list')
     
+    user = get_object_or_404(User.objects.only('id', 'email', 'is_active'), pk=pk)
+    
+    # Write just the status column instead of re-saving the whole row. The
+    # UPDATE only matches if the status is still the one read above, so a
+    # concurrent toggle cannot flip it twice or count the change twice.
+    updated = User.objects.filter(pk=user.pk, is_active=user.is_active).update(
+        is_active=not user.is_active,
+        updated_at=timezone.now(),
+    )
     user.is_active = not user.is_active
-    user.save()
+    if updated:
+        # QuerySet.update() skips the signals that maintain UserStats
+        change = 1 if user.is_active else -1
+        UserStats.apply_delta(active=change, inactive=-change)
     
     status = 'activated' if user.is_active else 'deactivated'
     messages.success(request, f'User {user.email} has been {status}.')
@@ -225,6 +310,8 @@ def user_toggle_status(request, pk):
 # ============================================================================
 
 @login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_profile_etag, last_modified_func=_profile_last_modified)
 def profile_view(request):
     """
     View current user's profile.
@@ -2,31 +2,46 @@
 Core context processors for Staffly.
 Provides global template context variables.
 """
+from types import MappingProxyType
+
+from accounts.decorators import get_user_role
+from accounts.models import User
+
+
+# Context for anonymous users, shared across requests
+GUEST_ROLE_CONTEXT = MappingProxyType({
+    'is_admin': False,
+    'is_staff_member': False,
+    'is_regular_user': False,
+    'user_role': None,
+    'user_role_display': 'Guest',
+})
+
+ROLE_LABELS = dict(User.Role.choices)
 
 
 def user_role_context(request):
     """
     Add user role information to template context.
     This makes role information available in all templates.
+    The result is memoized on the request.
     """
-    context = {
-        'is_admin': False,
-        'is_staff_member': False,
-        'is_regular_user': False,
-        'user_role': None,
-        'user_role_display': 'Guest',
-    }
+    try:
+        return request._role_context
+    except AttributeError:
+        pass
     
-    if request.user.is_authenticated:
-        user = request.user
-        context['user_role'] = user.role
-        context['user_role_display'] = user.get_role_display()
-        
-        if user.role == 'ADMIN':
-            context['is_admin'] = True
-        elif user.role == 'STAFF':
-            context['is_staff_member'] = True
-        else:
-            context['is_regular_user'] = True
+    role = get_user_role(request)
+    if role is None:
+        context = GUEST_ROLE_CONTEXT
+    else:
+        context = {
+            'is_admin': role == User.Role.ADMIN,
+            'is_staff_member': role == User.Role.STAFF,
+            'is_regular_user': role not in User.STAFF_ROLES,
+            'user_role': role,
+            'user_role_display': ROLE_LABELS.get(role, role),
+        }
     
+    request._role_context = context
     return context
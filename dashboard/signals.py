@@ -0,0 +1,18 @@
+"""
+Signal handlers for the dashboard app.
+Keep cached dashboard statistics in step with user changes.
+"""
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from accounts.models import User
+
+ADMIN_STATS_CACHE_KEY = 'dashboard:admin_stats'
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_admin_stats(sender, **kwargs):
+    """Drop cached admin dashboard statistics when a user changes."""
+    cache.delete(ADMIN_STATS_CACHE_KEY)
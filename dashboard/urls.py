@@ -9,6 +9,7 @@ app_name = 'dashboard'
 urlpatterns = [
     path('', views.dashboard_router, name='router'),
     path('admin/', views.admin_dashboard, name='admin'),
+    path('admin/stats.json', views.admin_dashboard_stats_json, name='admin_stats'),
     path('staff/', views.staff_dashboard, name='staff'),
     path('user/', views.user_dashboard, name='user'),
 ]
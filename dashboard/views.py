@@ -2,14 +2,21 @@
 Dashboard views for Staffly.
 Provides role-based dashboards for Admin, Staff, and Regular users.
 """
+from django.http import JsonResponse
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
-from django.db.models import Count
+from django.core.cache import cache
+from django.db.models import Count, Q
 from django.utils import timezone
-from datetime import timedelta
+from datetime import datetime, time, timedelta
 
-from accounts.models import User
-from accounts.decorators import admin_required, staff_required
+from accounts.models import User, UserStats
+from accounts.decorators import admin_required, staff_required, get_user_role
+
+from .signals import ADMIN_STATS_CACHE_KEY
+
+# Seconds the admin dashboard statistics may be served from the cache
+ADMIN_STATS_CACHE_TIMEOUT = 60
 
 
 @login_required
@@ -17,78 +24,115 @@ def dashboard_router(request):
     """
     Route users to their appropriate dashboard based on role.
     """
-    user = request.user
+    role = get_user_role(request)
     
-    if user.role == 'ADMIN':
+    if role == 'ADMIN':
         return redirect('dashboard:admin')
-    elif user.role == 'STAFF':
+    elif role == 'STAFF':
         return redirect('dashboard:staff')
     else:
         return redirect('dashboard:user')
 
 
+def _start_of_day(day):
+    """Return the aware datetime at which the given date starts."""
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _admin_stats():
+    """Compute admin dashboard user statistics."""
+    # Totals and role breakdown come from the denormalized counters row
+    counters = UserStats.current()
+    
+    # Recent activity, as half-open datetime ranges so the date_joined and
+    # last_login indexes can be used (a __date lookup wraps the column)
+    today = timezone.localdate()
+    today_start = _start_of_day(today)
+    tomorrow_start = _start_of_day(today + timedelta(days=1))
+    week_ago_start = _start_of_day(today - timedelta(days=7))
+    month_ago_start = _start_of_day(today - timedelta(days=30))
+    
+    activity = User.objects.aggregate(
+        new_users_week=Count('pk', filter=Q(date_joined__gte=week_ago_start)),
+        new_users_month=Count('pk', filter=Q(date_joined__gte=month_ago_start)),
+        # Active today (logged in today)
+        active_today=Count('pk', filter=Q(
+            last_login__gte=today_start,
+            last_login__lt=tomorrow_start,
+        )),
+    )
+    
+    return {
+        'total_users': counters.total,
+        'active_users': counters.active,
+        'inactive_users': counters.inactive,
+        'admin_count': counters.admin_count,
+        'staff_count': counters.staff_count,
+        'user_count': counters.user_count,
+        **activity,
+    }
+
+
 @admin_required
 def admin_dashboard(request):
     """
     Admin dashboard with system analytics and user statistics.
-    """
-    # User statistics
-    total_users = User.objects.count()
-    active_users = User.objects.filter(is_active=True).count()
-    inactive_users = User.objects.filter(is_active=False).count()
-    
-    # Role breakdown
-    admin_count = User.objects.filter(role='ADMIN').count()
-    staff_count = User.objects.filter(role='STAFF').count()
-    user_count = User.objects.filter(role='USER').count()
     
-    # Recent activity
-    today = timezone.now().date()
-    week_ago = today - timedelta(days=7)
-    month_ago = today - timedelta(days=30)
-    
-    new_users_week = User.objects.filter(date_joined__date__gte=week_ago).count()
-    new_users_month = User.objects.filter(date_joined__date__gte=month_ago).count()
-    
-    # Recent users
-    recent_users = User.objects.order_by('-date_joined')[:5]
-    
-    # Active today (logged in today)
-    active_today = User.objects.filter(last_login__date=today).count()
+    The statistics cards are filled in by the page from
+    admin_dashboard_stats_json once it has rendered.
+    """
+    # Recent users; User has no relations the card reads, so there is
+    # nothing to join, only the rendered columns to load
+    recent_users = User.objects.only(
+        'id', 'email', 'first_name', 'last_name', 'profile_picture',
+        'role', 'date_joined',
+    ).order_by('-date_joined')[:5]
     
     context = {
-        'total_users': total_users,
-        'active_users': active_users,
-        'inactive_users': inactive_users,
-        'admin_count': admin_count,
-        'staff_count': staff_count,
-        'user_count': user_count,
-        'new_users_week': new_users_week,
-        'new_users_month': new_users_month,
         'recent_users': recent_users,
-        'active_today': active_today,
     }
     
     return render(request, 'dashboard/admin_dashboard.html', context)
 
 
+@admin_required
+def admin_dashboard_stats_json(request):
+    """
+    Admin dashboard user statistics as JSON.
+    """
+    # Statistics are cached briefly and dropped whenever a user is saved
+    stats = cache.get(ADMIN_STATS_CACHE_KEY)
+    if stats is None:
+        stats = _admin_stats()
+        cache.set(ADMIN_STATS_CACHE_KEY, stats, ADMIN_STATS_CACHE_TIMEOUT)
+    
+    return JsonResponse(stats)
+
+
 @staff_required
 def staff_dashboard(request):
     """
     Staff dashboard with limited view.
     """
-    # Staff can see other staff and regular users
+    # Columns the colleague and department member cards render
+    card_fields = (
+        'id', 'email', 'first_name', 'last_name', 'profile_picture',
+        'job_title', 'department', 'role',
+    )
+    
+    # Staff can see other staff and regular users; the (role, is_active,
+    # first_name) index narrows the scan to active users of those roles
     colleagues = User.objects.filter(
-        role__in=['STAFF', 'USER'],
+        role__in=[User.Role.STAFF, User.Role.USER],
         is_active=True
-    ).exclude(pk=request.user.pk).order_by('first_name')[:10]
+    ).exclude(pk=request.user.pk).only(*card_fields).order_by('first_name')[:10]
     
     # Department members
     if request.user.department:
         department_members = User.objects.filter(
             department=request.user.department,
             is_active=True
-        ).exclude(pk=request.user.pk)
+        ).exclude(pk=request.user.pk).only(*card_fields)
     else:
         department_members = User.objects.none()
     
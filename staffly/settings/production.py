@@ -21,6 +21,10 @@ DATABASES = {
     )
 }
 
+# Fail fast instead of hanging a worker when PostgreSQL is unreachable
+if DATABASES['default'].get('ENGINE') == 'django.db.backends.postgresql':
+    DATABASES['default'].setdefault('OPTIONS', {})['connect_timeout'] = 3
+
 # Static files with WhiteNoise
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
@@ -22,10 +22,9 @@ urlpatterns = [
     path('dashboard/', include('dashboard.urls')),
 ]
 
-# Serve media files in development
+# Serve media files in development (static files are served by WhiteNoise)
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
-    urlpatterns += static(settings.STATIC_URL, document_root=settings.STATICFILES_DIRS[0])
 
 # Customize admin site
 admin.site.site_header = 'Staffly Administration'